@@ -1,30 +1,55 @@
 import sqlite3
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import random
+from datetime import datetime
 import requests
 import json
 import re
 import openpyxl
 from openpyxl.chart import BarChart, PieChart, LineChart, Reference
 from openpyxl.styles import Font, PatternFill, Alignment
+from openpyxl.utils import get_column_letter
 from pathlib import Path
+from itertools import chain, islice
 import argparse
 import sys
 import logging
+import queue
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class DatabaseManager:    
+@lru_cache(maxsize=None)
+def _insert_sql(table, cols, rows_per_stmt):
+    """Build (packed, single-row) INSERT templates once per shape"""
+    placeholder = "(" + ",".join(["?"] * len(cols)) + ")"
+    head = f"INSERT INTO {table} ({', '.join(cols)}) VALUES "
+    return head + ",".join([placeholder] * rows_per_stmt), head + placeholder
+
+_FENCE_RE = re.compile(r'```(?:sql)?\s*\n?')
+_INTENT_RE = re.compile(r'(?P<toshkent>toshkent)|(?P<mijoz>mijoz)|(?P<viloyat>viloyat)|(?P<balans>balans)')
+
+FIRST_NAMES = np.array(['Akbar', 'Ali', 'Bobur', 'Davron', 'Eldor', 'Farrux', 'Jasur', 'Karim', 'Laziz', 'Mansur', 'Nodir', 'Otabek', 'Rustam', 'Sanjar', 'Timur', 'Aida', 'Barno', 'Dildora', 'Elnora', 'Feruza', 'Gulnora', 'Hilola', 'Iroda', 'Jamila', 'Kamola', 'Laylo', 'Malika', 'Nargiza', 'Oysha'])
+LAST_NAMES = np.array(['Aliyev', 'Karimov', 'Rahimov', 'Nazarov', 'Mamatov', 'Toshev', 'Safarov', 'Jumayev', 'Ergashev', 'Mirzayev', 'Komilov', 'Yunusov'])
+
+class DatabaseManager:
     def __init__(self, db_path: str = "bank_data.db"):
         self.db_path = db_path
-    
+        self.lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=512)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+
     def get_connection(self):
-        conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        conn.row_factory = sqlite3.Row
-        return conn
+        return self._conn
+
+    def close(self):
+        self._conn.close()
     
     def create_tables(self):
         conn = self.get_connection()
@@ -74,96 +99,173 @@ class DatabaseManager:
         cursor.execute('CREATE INDEX IF NOT EXISTS idx_accounts_client ON accounts(client_id)')
         
         conn.commit()
-        conn.close()
         logger.info("Jadvallar yaratildi")
     
     def generate_mock_data(self, num_clients: int = 50000):
         """Generate mock data"""
         conn = self.get_connection()
         cursor = conn.cursor()
-        
+
         cursor.execute("SELECT COUNT(*) FROM clients")
         if cursor.fetchone()[0] > 0:
             logger.info("Ma'lumotlar allaqachon mavjud")
-            conn.close()
             return
-        
+
         logger.info("Mock data yaratish boshlandi...")
+
+        cursor.executescript('''
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;
+        PRAGMA cache_size=-200000;
+        ''')
+        cursor.executescript('''
+        DROP INDEX IF EXISTS idx_transactions_date;
+        DROP INDEX IF EXISTS idx_transactions_account;
+        DROP INDEX IF EXISTS idx_clients_region;
+        DROP INDEX IF EXISTS idx_accounts_client;
+        ''')
+        cursor.execute("BEGIN IMMEDIATE")
         
-        regions = ['Toshkent', 'Samarqand', 'Buxoro', 'Andijon', 'Farg\'ona', 
+        regions = ['Toshkent', 'Samarqand', 'Buxoro', 'Andijon', 'Farg\'ona',
                   'Namangan', 'Qashqadaryo', 'Surxondaryo', 'Jizzax', 'Sirdaryo',
                   'Navoiy', 'Xorazm', 'Qoraqalpog\'iston']
-        
-        clients_data = []
-        for i in range(num_clients):
-            name = self._generate_name()
-            birth_date = self._random_date(datetime(1950, 1, 1), datetime(2005, 12, 31))
-            region = random.choice(regions)
-            phone = f"+998{random.randint(10, 99)}{random.randint(1000000, 9999999)}"
-            email = f"user{i}@email.uz"
-            clients_data.append((name, birth_date, region, phone, email))
-            
-            if i % 10000 == 0:
-                logger.info(f"Mijozlar: {i}/{num_clients}")
-        
-        cursor.executemany('INSERT INTO clients (name, birth_date, region, phone, email) VALUES (?, ?, ?, ?, ?)', clients_data)
-        
+
+        rng = np.random.default_rng()
+
+        self._insert_pipelined(cursor, 'clients', ['name', 'birth_date', 'region', 'phone', 'email'],
+                               self._iter_clients(rng, regions, num_clients))
+
         logger.info("Hisoblar yaratilmoqda...")
-        accounts_data = []
         account_types = ['savings', 'checking', 'business', 'credit']
-        
-        for client_id in range(1, num_clients + 1):
-            num_accounts = random.randint(1, 3)
-            for _ in range(num_accounts):
-                account_number = f"8600{random.randint(1000000000000000, 9999999999999999)}"
-                balance = round(random.uniform(1000, 100000000), 2)
-                account_type = random.choice(account_types)
-                open_date = self._random_date(datetime(2020, 1, 1), datetime(2024, 12, 31))
-                accounts_data.append((client_id, account_number, balance, account_type, open_date))
-        
-        cursor.executemany('INSERT INTO accounts (client_id, account_number, balance, account_type, open_date) VALUES (?, ?, ?, ?, ?)', accounts_data)
-        
+        self._insert_pipelined(cursor, 'accounts', ['client_id', 'account_number', 'balance', 'account_type', 'open_date'],
+                               self._iter_accounts(rng, account_types, num_clients))
+
         logger.info("Tranzaksiyalar yaratilmoqda...")
-        cursor.execute("SELECT id FROM accounts")
-        account_ids = [row[0] for row in cursor.fetchall()]
-        
+        cursor.execute("SELECT MIN(id), MAX(id) FROM accounts")
+        lo_id, hi_id = cursor.fetchone()
+        account_ids = np.arange(lo_id, hi_id + 1)
+
         transaction_types = ['debit', 'credit', 'transfer', 'payment', 'withdrawal', 'deposit']
-        transactions_batch = []
-        batch_size = 10000
-        total = 0
-        
-        for account_id in account_ids:
-            num_trans = random.randint(10, 50)
-            for _ in range(num_trans):
-                amount = round(random.uniform(-50000, 100000), 2)
-                date = self._random_date(datetime(2023, 1, 1), datetime(2024, 9, 27))
-                tx_type = random.choice(transaction_types)
-                description = f"{tx_type.title()} transaction"
-                ref = f"TX{random.randint(100000000, 999999999)}"
-                transactions_batch.append((account_id, amount, date, tx_type, description, ref))
-                total += 1
-                
-                if len(transactions_batch) >= batch_size:
-                    cursor.executemany('INSERT INTO transactions (account_id, amount, date, type, description, reference_number) VALUES (?, ?, ?, ?, ?, ?)', transactions_batch)
-                    conn.commit()
-                    transactions_batch = []
-                    logger.info(f"Tranzaksiyalar: {total}")
-        
-        if transactions_batch:
-            cursor.executemany('INSERT INTO transactions (account_id, amount, date, type, description, reference_number) VALUES (?, ?, ?, ?, ?, ?)', transactions_batch)
-        
+        total = self._insert_pipelined(cursor, 'transactions', ['account_id', 'amount', 'date', 'type', 'description', 'reference_number'],
+                                       self._iter_transactions(rng, transaction_types, account_ids))
+
         conn.commit()
-        conn.close()
+
+        logger.info("Indekslar qayta yaratilmoqda...")
+        cursor.executescript('''
+        CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions(date);
+        CREATE INDEX IF NOT EXISTS idx_transactions_account ON transactions(account_id);
+        CREATE INDEX IF NOT EXISTS idx_clients_region ON clients(region);
+        CREATE INDEX IF NOT EXISTS idx_accounts_client ON accounts(client_id);
+        ANALYZE;
+        ''')
         logger.info(f"Mock data yaratish tugadi. Jami: {total}")
     
-    def _generate_name(self):
-        first = random.choice(['Akbar', 'Ali', 'Bobur', 'Davron', 'Eldor', 'Farrux', 'Jasur', 'Karim', 'Laziz', 'Mansur', 'Nodir', 'Otabek', 'Rustam', 'Sanjar', 'Timur', 'Aida', 'Barno', 'Dildora', 'Elnora', 'Feruza', 'Gulnora', 'Hilola', 'Iroda', 'Jamila', 'Kamola', 'Laylo', 'Malika', 'Nargiza', 'Oysha'])
-        last = random.choice(['Aliyev', 'Karimov', 'Rahimov', 'Nazarov', 'Mamatov', 'Toshev', 'Safarov', 'Jumayev', 'Ergashev', 'Mirzayev', 'Komilov', 'Yunusov'])
-        return f"{first} {last}"
-    
-    def _random_date(self, start, end):
-        delta = end - start
-        return (start + timedelta(days=random.randint(0, delta.days))).strftime('%Y-%m-%d')
+    def _iter_clients(self, rng, regions, num_clients, chunk_size=50000):
+        """Yield client rows in vectorized chunks without materializing them all"""
+        regions_arr = np.array(regions)
+        for lo in range(0, num_clients, chunk_size):
+            n = min(chunk_size, num_clients - lo)
+            names = np.char.add(np.char.add(rng.choice(FIRST_NAMES, size=n), ' '),
+                                rng.choice(LAST_NAMES, size=n))
+            birth_dates = self._random_dates(rng, '1950-01-01', '2005-12-31', n)
+            regions_col = rng.choice(regions_arr, size=n)
+            phones = np.char.add('+998', np.char.add(
+                rng.integers(10, 100, size=n).astype(str),
+                rng.integers(1000000, 10000000, size=n).astype(str)))
+            emails = np.char.add(np.char.add('user', np.arange(lo, lo + n).astype(str)), '@email.uz')
+            yield from zip(names.tolist(), birth_dates.tolist(), regions_col.tolist(), phones.tolist(), emails.tolist())
+
+    def _iter_accounts(self, rng, account_types, num_clients, chunk_size=50000):
+        """Yield account rows in vectorized chunks, 1-3 accounts per client"""
+        types_arr = np.array(account_types)
+        # sequential suffixes from a random base: guaranteed unique, no UNIQUE retries
+        number_base = int(rng.integers(1000000000000000, 9000000000000000))
+        offset = 0
+        for lo in range(1, num_clients + 1, chunk_size):
+            n = min(chunk_size, num_clients + 1 - lo)
+            per_client = rng.integers(1, 4, size=n)
+            client_ids = np.repeat(np.arange(lo, lo + n), per_client)
+            m = client_ids.size
+            account_numbers = np.char.add('8600', (number_base + offset + np.arange(m)).astype(str))
+            offset += m
+            balances = np.round(rng.uniform(1000, 100000000, size=m), 2)
+            acc_types_col = rng.choice(types_arr, size=m)
+            open_dates = self._random_dates(rng, '2020-01-01', '2024-12-31', m)
+            yield from zip(client_ids.tolist(), account_numbers.tolist(), balances.tolist(), acc_types_col.tolist(), open_dates.tolist())
+
+    def _iter_transactions(self, rng, transaction_types, account_ids, chunk_size=50000):
+        """Yield transaction rows in vectorized chunks, 10-50 per account"""
+        types_arr = np.array(transaction_types)
+        offset = 0
+        for lo in range(0, account_ids.size, chunk_size):
+            ids = account_ids[lo:lo + chunk_size]
+            per_account = rng.integers(10, 51, size=ids.size)
+            tx_account_ids = np.repeat(ids, per_account)
+            m = tx_account_ids.size
+            amounts = np.round(rng.uniform(-50000, 100000, size=m), 2)
+            tx_dates = self._random_dates(rng, '2023-01-01', '2024-09-27', m)
+            tx_types_col = rng.choice(types_arr, size=m)
+            descriptions = np.char.add(np.char.capitalize(tx_types_col), ' transaction')
+            refs = np.char.add('TX', (100000000 + offset + np.arange(m)).astype(str))
+            offset += m
+            yield from zip(tx_account_ids.tolist(), amounts.tolist(), tx_dates.tolist(), tx_types_col.tolist(), descriptions.tolist(), refs.tolist())
+
+    def _insert_pipelined(self, cursor, table, cols, rows, batch_rows=10000):
+        """Overlap row generation (producer thread) with SQLite writes"""
+        batches = queue.Queue(maxsize=8)
+        producer_error = []
+
+        def produce():
+            try:
+                rows_it = iter(rows)
+                while True:
+                    batch = list(islice(rows_it, batch_rows))
+                    if not batch:
+                        break
+                    batches.put(batch)
+            except Exception as e:
+                producer_error.append(e)
+            finally:
+                # sentinel har doim yuboriladi - aks holda consumer
+                # producer xatosida get() da abadiy qotib qoladi
+                batches.put(None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        inserted = 0
+        while (batch := batches.get()) is not None:
+            inserted += self._bulk_insert(cursor, table, cols, batch)
+        producer.join()
+        if producer_error:
+            raise producer_error[0]
+        return inserted
+
+    def _bulk_insert(self, cursor, table, cols, rows, rows_per_stmt=100):
+        """Insert rows from any iterable with packed multi-row VALUES statements"""
+        packed_sql, single_sql = _insert_sql(table, tuple(cols), rows_per_stmt)
+
+        rows = iter(rows)
+        inserted = 0
+        while True:
+            batch = list(islice(rows, rows_per_stmt))
+            inserted += len(batch)
+            if len(batch) == rows_per_stmt:
+                cursor.execute(packed_sql, list(chain.from_iterable(batch)))
+            else:
+                for row in batch:
+                    cursor.execute(single_sql, row)
+                return inserted
+
+    def _random_dates(self, rng, start: str, end: str, size: int):
+        """Sample `size` random dates in [start, end] as 'YYYY-MM-DD' strings"""
+        start64 = np.datetime64(start)
+        num_days = int((np.datetime64(end) - start64).astype(int)) + 1
+        days = rng.integers(0, num_days, size=size)
+        return (start64 + days.astype('timedelta64[D]')).astype(str)
 
 class LLMQueryGenerator:
     """LLM query generator"""
@@ -171,6 +273,8 @@ class LLMQueryGenerator:
     def __init__(self, model_url: str = "http://localhost:11434"):
         self.model_url = model_url
         self.model_name = "llama3.2"
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
     
     def generate_sql(self, prompt: str) -> str:
         schema = """
@@ -185,7 +289,7 @@ class LLMQueryGenerator:
         full_prompt = f"{schema}\n\nUser: {prompt}\n\nGenerate SQL query (only SQL, no explanation):\n"
         
         try:
-            response = requests.post(f"{self.model_url}/api/generate", json={"model": self.model_name, "prompt": full_prompt, "stream": False}, timeout=30)
+            response = self.session.post(f"{self.model_url}/api/generate", json={"model": self.model_name, "prompt": full_prompt, "stream": False}, timeout=30)
             
             if response.status_code == 200:
                 sql = response.json().get("response", "").strip()
@@ -196,93 +300,148 @@ class LLMQueryGenerator:
             return self._fallback_sql(prompt)
     
     def _clean_sql(self, sql):
-        sql = re.sub(r'```sql\n?', '', sql)
-        sql = re.sub(r'```\n?', '', sql)
+        sql = _FENCE_RE.sub('', sql)
         sql = ' '.join(sql.split())
         if not sql.strip().endswith(';'):
             sql += ';'
         return sql.strip()
     
     def _fallback_sql(self, prompt):
-        prompt_lower = prompt.lower()
-        if 'toshkent' in prompt_lower and 'mijoz' in prompt_lower:
+        hits = {match.lastgroup for match in _INTENT_RE.finditer(prompt.lower())}
+        if 'toshkent' in hits and 'mijoz' in hits:
             return "SELECT COUNT(*) as mijozlar FROM clients WHERE region = 'Toshkent';"
-        elif 'viloyat' in prompt_lower:
+        elif 'viloyat' in hits:
             return "SELECT region, COUNT(*) as mijozlar FROM clients GROUP BY region ORDER BY mijozlar DESC;"
-        elif 'balans' in prompt_lower:
+        elif 'balans' in hits:
             return "SELECT account_number, balance FROM accounts ORDER BY balance DESC LIMIT 10;"
         else:
             return "SELECT COUNT(*) as jami FROM clients;"
 
-class ExcelExporter:    
+class ExcelExporter:
+    WRITE_ONLY_THRESHOLD = 10000  # rows; above this stream without styling/charts
+    CHART_CLASSES = {'bar': BarChart, 'pie': PieChart, 'line': LineChart}
+
     def export_data(self, data, filename, chart_type='bar'):
-        if not data:
+        if len(data) == 0:
             return None
-        
-        df = pd.DataFrame(data)
+
+        if isinstance(data, pd.DataFrame):
+            columns = list(data.columns)
+            row_values = data.itertuples(index=False, name=None)
+        else:
+            columns = list(data[0].keys())
+            row_values = ([row[col] for col in columns] for row in data)
+
         Path("reports").mkdir(exist_ok=True)
         filepath = f"reports/{filename}"
-        
-        with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
-            df.to_excel(writer, sheet_name='Data', index=False)
-            workbook = writer.book
-            worksheet = writer.sheets['Data']
-            
-            header_font = Font(bold=True, color="FFFFFF")
-            header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-            for cell in worksheet[1]:
-                cell.font = header_font
-                cell.fill = header_fill
-                cell.alignment = Alignment(horizontal="center")
-            
-            for column in worksheet.columns:
-                max_length = 0
-                column_letter = column[0].column_letter
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                worksheet.column_dimensions[column_letter].width = min(max_length + 2, 50)
-            
-            if len(df.columns) >= 2:
-                rows = len(df) + 1
-                try:
-                    if chart_type == 'pie':
-                        chart = PieChart()
-                        data_ref = Reference(worksheet, min_col=2, min_row=1, max_row=rows)
-                        labels = Reference(worksheet, min_col=1, min_row=2, max_row=rows)
-                        chart.add_data(data_ref, titles_from_data=True)
-                        chart.set_categories(labels)
-                    elif chart_type == 'line':
-                        chart = LineChart()
-                        data_ref = Reference(worksheet, min_col=2, min_row=1, max_row=rows)
-                        labels = Reference(worksheet, min_col=1, min_row=2, max_row=rows)
-                        chart.add_data(data_ref, titles_from_data=True)
-                        chart.set_categories(labels)
-                    else:
-                        chart = BarChart()
-                        data_ref = Reference(worksheet, min_col=2, min_row=1, max_row=rows)
-                        labels = Reference(worksheet, min_col=1, min_row=2, max_row=rows)
-                        chart.add_data(data_ref, titles_from_data=True)
-                        chart.set_categories(labels)
-                    
-                    chart.title = "Ma'lumotlar tahlili"
-                    chart.width = 15
-                    chart.height = 10
-                    worksheet.add_chart(chart, "E2")
-                except:
-                    pass
-        
+
+        if len(data) > self.WRITE_ONLY_THRESHOLD:
+            workbook = openpyxl.Workbook(write_only=True)
+            worksheet = workbook.create_sheet('Data')
+            worksheet.append(columns)
+            for values in row_values:
+                worksheet.append(values)
+            workbook.save(filepath)
+            logger.info(f"Excel yaratildi (write-only): {filepath}")
+            return filepath
+
+        workbook = openpyxl.Workbook()
+        worksheet = workbook.active
+        worksheet.title = 'Data'
+        worksheet.append(columns)
+
+        widths = [len(col) for col in columns]
+        for values in row_values:
+            worksheet.append(values)
+            for i, value in enumerate(values):
+                length = len(str(value))
+                if length > widths[i]:
+                    widths[i] = length
+
+        header_font = Font(bold=True, color="FFFFFF")
+        header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        for cell in worksheet[1]:
+            cell.font = header_font
+            cell.fill = header_fill
+            cell.alignment = Alignment(horizontal="center")
+
+        for i, width in enumerate(widths):
+            worksheet.column_dimensions[get_column_letter(i + 1)].width = min(width + 2, 50)
+
+        if len(columns) >= 2:
+            rows = len(data) + 1
+            try:
+                chart = self.CHART_CLASSES.get(chart_type, BarChart)()
+
+                data_ref = Reference(worksheet, min_col=2, min_row=1, max_row=rows)
+                labels = Reference(worksheet, min_col=1, min_row=2, max_row=rows)
+                chart.add_data(data_ref, titles_from_data=True)
+                chart.set_categories(labels)
+
+                chart.title = "Ma'lumotlar tahlili"
+                chart.width = 15
+                chart.height = 10
+                worksheet.add_chart(chart, "E2")
+            except:
+                pass
+
+        workbook.save(filepath)
         logger.info(f"Excel yaratildi: {filepath}")
         return filepath
 
-class BankAnalystAssistant:    
+class SemanticQueryCache:
+    """Embedding cache for paraphrased prompts (ixtiyoriy: sentence-transformers + hnswlib)"""
+
+    MODEL_NAME = 'paraphrase-multilingual-MiniLM-L12-v2'
+
+    def __init__(self, threshold: float = 0.92, max_items: int = 1024):
+        self.threshold = threshold
+        self.max_items = max_items
+        self.enabled = False
+        self._results = {}
+
+        try:
+            from sentence_transformers import SentenceTransformer
+            import hnswlib
+        except ImportError:
+            logger.info("Semantic cache o'chirilgan (pip install sentence-transformers hnswlib)")
+            return
+
+        self._model = SentenceTransformer(self.MODEL_NAME)
+        self._index = hnswlib.Index(space='cosine', dim=self._model.get_sentence_embedding_dimension())
+        self._index.init_index(max_elements=max_items, ef_construction=200, M=16)
+        self.enabled = True
+
+    def get(self, prompt):
+        if not self.enabled or not self._results:
+            return None
+        vec = self._model.encode([prompt])
+        labels, dists = self._index.knn_query(vec, k=1)
+        if 1 - dists[0][0] >= self.threshold:
+            return self._results.get(int(labels[0][0]))
+        return None
+
+    def add(self, prompt, result):
+        if not self.enabled or len(self._results) >= self.max_items:
+            return
+        item_id = len(self._results)
+        self._index.add_items(self._model.encode([prompt]), [item_id])
+        self._results[item_id] = result
+
+class BankAnalystAssistant:
+    CACHE_MAX_SIZE = 256
+    CACHE_TTL = 3600  # 1 hour
+    MAX_ROWS = 10000  # worst-case bound for LLM-generated SQL
+
     def __init__(self, db_path="bank_data.db"):
         self.db_manager = DatabaseManager(db_path)
         self.llm_generator = LLMQueryGenerator()
         self.excel_exporter = ExcelExporter()
+        self._query_cache = OrderedDict()
+        # gthread workerlar va parallel validatorlar bitta assistantni
+        # bo'lishadi - LRU mutatsiyalari lock ostida bo'lishi shart
+        self._cache_lock = threading.Lock()
+        self._semantic_cache = SemanticQueryCache()
     
     def setup_database(self, generate_data=True):
         logger.info("Database sozlanmoqda...")
@@ -290,28 +449,51 @@ class BankAnalystAssistant:
         if generate_data:
             self.db_manager.generate_mock_data()
     
-    def process_query(self, prompt):
+    def process_query(self, prompt, limit=None):
         logger.info(f"Query: {prompt}")
+
+        # LIMIT SQL darajasida qo'llanadi - keraksiz qatorlar umuman
+        # o'qilmaydi va xotiraga olinmaydi
+        row_limit = min(limit, self.MAX_ROWS) if limit else self.MAX_ROWS
+
+        cache_key = f"{row_limit}:" + re.sub(r'\s+', ' ', prompt.strip().lower())
+        with self._cache_lock:
+            cached = self._query_cache.get(cache_key)
+            if cached and time.time() - cached[0] < self.CACHE_TTL:
+                self._query_cache.move_to_end(cache_key)
+                logger.info("Cache hit")
+                return cached[1]
+
+        if limit is None:
+            semantic_hit = self._semantic_cache.get(prompt)
+            if semantic_hit is not None:
+                logger.info("Semantic cache hit")
+                return semantic_hit
+
         sql = self.llm_generator.generate_sql(prompt)
         logger.info(f"SQL: {sql}")
         
         try:
-            conn = self.db_manager.get_connection()
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            results = cursor.fetchall()
-            columns = [d[0] for d in cursor.description]
-            data = [dict(zip(columns, row)) for row in results]
-            conn.close()
-            
-            return {'success': True, 'sql_query': sql, 'data': data, 'row_count': len(data)}
+            bounded_sql = f"SELECT * FROM ({sql.rstrip(';').strip()}) LIMIT ?"
+            with self.db_manager.lock:
+                conn = self.db_manager.get_connection()
+                df = pd.read_sql_query(bounded_sql, conn, params=(row_limit,))
+
+            result = {'success': True, 'sql_query': sql, 'data': df, 'row_count': len(df)}
+            with self._cache_lock:
+                self._query_cache[cache_key] = (time.time(), result)
+                if len(self._query_cache) > self.CACHE_MAX_SIZE:
+                    self._query_cache.popitem(last=False)
+            if limit is None:
+                self._semantic_cache.add(prompt, result)
+            return result
         except Exception as e:
             logger.error(f"SQL xato: {e}")
             return {'success': False, 'error': str(e), 'sql_query': sql, 'data': []}
     
     def generate_report(self, prompt, chart_type='bar'):
         result = self.process_query(prompt)
-        if not result['success'] or not result['data']:
+        if not result['success'] or len(result['data']) == 0:
             return None
         
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
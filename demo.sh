@@ -88,7 +88,7 @@ cleanup() {
 }
 trap cleanup EXIT INT TERM
 
-if python web_app.py; then
+if gunicorn -c gunicorn.conf.py web_app:app; then
     print_status "Web application ishga tushdi"
 else
     print_error "Web application xatosi"
@@ -0,0 +1,24 @@
+# gunicorn.conf.py - production server sozlamalari
+# Ishga tushirish: gunicorn -c gunicorn.conf.py web_app:app
+import multiprocessing
+
+bind = "0.0.0.0:5000"
+workers = multiprocessing.cpu_count() * 2 + 1
+# gthread: I/O-bound API (SQLite o'qish + LLM chaqiruvlar) uchun
+# threadlar yetarli; gevent requirements.txt da yo'q
+worker_class = "gthread"
+threads = 8
+worker_connections = 2000
+max_requests = 1000
+max_requests_jitter = 50
+timeout = 60
+# nginx upstream keepalive bilan mos: ulanishlar 30s qayta ishlatiladi
+keepalive = 30
+preload_app = True
+
+
+def post_fork(server, worker):
+    # SQLite connectionlar fork-safe emas: assistant har bir worker
+    # ichida, fork'dan keyin ochiladi
+    import web_app
+    web_app.init_assistant()
@@ -1,173 +1,339 @@
 import os
+import re
+import math
 import logging
-from logging.handlers import RotatingFileHandler
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 import sqlite3
+from collections import OrderedDict, deque
 from contextlib import contextmanager
-from functools import lru_cache
+from functools import lru_cache, cached_property
+import heapq
 import threading
+import queue
 from typing import Dict, Any, Optional
 import time
 
-class ProductionConfig:    
-    DATABASE_PATH = os.getenv('DATABASE_PATH', 'bank_data.db')
-    DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '10'))
-    DATABASE_TIMEOUT = int(os.getenv('DATABASE_TIMEOUT', '30'))
+class ProductionConfig:
+    """Env'dan o'qiladigan sozlamalar - birinchi murojaatda bog'lanadi,
+    shuning uchun load_environment_config() override'lari ham ishlaydi"""
     
-    LLM_URL = os.getenv('LLM_URL', 'http://localhost:11434')
-    LLM_MODEL = os.getenv('LLM_MODEL', 'llama3.2')
-    LLM_TIMEOUT = int(os.getenv('LLM_TIMEOUT', '60'))
-    LLM_MAX_TOKENS = int(os.getenv('LLM_MAX_TOKENS', '2000'))
+    @cached_property
+    def DATABASE_PATH(self):
+        return os.getenv('DATABASE_PATH', 'bank_data.db')
     
-    CACHE_TTL = int(os.getenv('CACHE_TTL', '3600'))  # 1 hour
-    CACHE_MAX_SIZE = int(os.getenv('CACHE_MAX_SIZE', '1000'))
+    @cached_property
+    def DATABASE_POOL_SIZE(self):
+        return int(os.getenv('DATABASE_POOL_SIZE', '10'))
     
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev-key-change-in-production')
-    MAX_QUERY_LENGTH = int(os.getenv('MAX_QUERY_LENGTH', '1000'))
-    RATE_LIMIT_PER_MINUTE = int(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
+    @cached_property
+    def DATABASE_TIMEOUT(self):
+        return int(os.getenv('DATABASE_TIMEOUT', '30'))
     
-    REPORTS_DIR = os.getenv('REPORTS_DIR', 'reports')
-    MAX_REPORT_SIZE_MB = int(os.getenv('MAX_REPORT_SIZE_MB', '100'))
-    CLEANUP_INTERVAL_HOURS = int(os.getenv('CLEANUP_INTERVAL_HOURS', '24'))
+    @cached_property
+    def LLM_URL(self):
+        return os.getenv('LLM_URL', 'http://localhost:11434')
     
-    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
-    LOG_FILE = os.getenv('LOG_FILE', 'bank_analyst.log')
-    LOG_MAX_SIZE_MB = int(os.getenv('LOG_MAX_SIZE_MB', '10'))
-    LOG_BACKUP_COUNT = int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    @cached_property
+    def LLM_MODEL(self):
+        return os.getenv('LLM_MODEL', 'llama3.2')
+    
+    @cached_property
+    def LLM_TIMEOUT(self):
+        return int(os.getenv('LLM_TIMEOUT', '60'))
+    
+    @cached_property
+    def LLM_MAX_TOKENS(self):
+        return int(os.getenv('LLM_MAX_TOKENS', '2000'))
+    
+    @cached_property
+    def CACHE_TTL(self):
+        return int(os.getenv('CACHE_TTL', '3600'))  # 1 hour
+    
+    @cached_property
+    def CACHE_MAX_SIZE(self):
+        return int(os.getenv('CACHE_MAX_SIZE', '1000'))
+    
+    @cached_property
+    def SECRET_KEY(self):
+        return os.getenv('SECRET_KEY', 'dev-key-change-in-production')
+    
+    @cached_property
+    def MAX_QUERY_LENGTH(self):
+        return int(os.getenv('MAX_QUERY_LENGTH', '1000'))
+    
+    @cached_property
+    def RATE_LIMIT_PER_MINUTE(self):
+        return int(os.getenv('RATE_LIMIT_PER_MINUTE', '60'))
+    
+    @cached_property
+    def REPORTS_DIR(self):
+        return os.getenv('REPORTS_DIR', 'reports')
+    
+    @cached_property
+    def MAX_REPORT_SIZE_MB(self):
+        return int(os.getenv('MAX_REPORT_SIZE_MB', '100'))
+    
+    @cached_property
+    def CLEANUP_INTERVAL_HOURS(self):
+        return int(os.getenv('CLEANUP_INTERVAL_HOURS', '24'))
+    
+    @cached_property
+    def LOG_LEVEL(self):
+        return os.getenv('LOG_LEVEL', 'INFO')
+    
+    @cached_property
+    def LOG_FILE(self):
+        return os.getenv('LOG_FILE', 'bank_analyst.log')
+    
+    @cached_property
+    def LOG_MAX_SIZE_MB(self):
+        return int(os.getenv('LOG_MAX_SIZE_MB', '10'))
+    
+    @cached_property
+    def LOG_BACKUP_COUNT(self):
+        return int(os.getenv('LOG_BACKUP_COUNT', '5'))
+    
+    def reload(self):
+        """Keshni tozalash - keyingi murojaat env'ni qayta o'qiydi"""
+        self.__dict__.clear()
+
+CONFIG = ProductionConfig()
 
 class DatabasePool:    
+    # SQLite allows one writer at a time, so a big write pool only
+    # queues on SQLite's own lock - keep it small and let reads scale
+    WRITE_POOL_SIZE = 2
+    
+    # NORMAL is durable enough under WAL - fsync only on checkpoint
+    _RW_PRAGMAS = (
+        'PRAGMA journal_mode=WAL',
+        'PRAGMA synchronous=NORMAL',
+        'PRAGMA busy_timeout=5000',
+        'PRAGMA mmap_size=268435456',
+        'PRAGMA cache_size=-65536',
+        'PRAGMA temp_store=memory',
+        'PRAGMA foreign_keys=ON',
+    )
+    _RO_PRAGMAS = (
+        'PRAGMA busy_timeout=5000',
+        'PRAGMA mmap_size=268435456',
+        'PRAGMA cache_size=-65536',
+        'PRAGMA temp_store=memory',
+    )
+    
     def __init__(self, db_path: str, pool_size: int = 10):
         self.db_path = db_path
         self.pool_size = pool_size
-        self._connections = []
-        self._lock = threading.Lock()
+        # LIFO keeps checkouts on the most recently used (cache-hot)
+        # connection; a full queue means callers block instead of
+        # silently growing past the configured pool size
+        self._ro_pool = queue.LifoQueue(maxsize=pool_size)
+        self._rw_pool = queue.LifoQueue(maxsize=self.WRITE_POOL_SIZE)
         self._create_pool()
     
+    def _configure(self, conn, pragmas):
+        """Har bir yangi connection uchun bir xil sozlamalar"""
+        conn.row_factory = sqlite3.Row
+        for pragma in pragmas:
+            conn.execute(pragma)
+        return conn
+    
     def _create_pool(self):
-        for _ in range(self.pool_size):
+        # writers first: this creates the file so mode=ro can open it
+        for _ in range(self.WRITE_POOL_SIZE):
             conn = sqlite3.connect(
                 self.db_path, 
                 check_same_thread=False,
-                timeout=ProductionConfig.DATABASE_TIMEOUT
+                timeout=CONFIG.DATABASE_TIMEOUT
+            )
+            self._rw_pool.put_nowait(self._configure(conn, self._RW_PRAGMAS))
+        
+        for _ in range(self.pool_size):
+            conn = sqlite3.connect(
+                f'file:{self.db_path}?mode=ro',
+                uri=True,
+                check_same_thread=False,
+                timeout=CONFIG.DATABASE_TIMEOUT
             )
-            conn.row_factory = sqlite3.Row
-            conn.execute('PRAGMA journal_mode=WAL')
-            conn.execute('PRAGMA synchronous=NORMAL')
-            conn.execute('PRAGMA cache_size=10000')
-            conn.execute('PRAGMA temp_store=memory')
-            self._connections.append(conn)
+            self._ro_pool.put_nowait(self._configure(conn, self._RO_PRAGMAS))
     
     @contextmanager
-    def get_connection(self):
-        with self._lock:
-            if self._connections:
-                conn = self._connections.pop()
-            else:
-                conn = sqlite3.connect(
-                    self.db_path,
-                    check_same_thread=False,
-                    timeout=ProductionConfig.DATABASE_TIMEOUT
-                )
-                conn.row_factory = sqlite3.Row
-        
+    def get_read_connection(self):
+        conn = self._ro_pool.get(timeout=CONFIG.DATABASE_TIMEOUT)
         try:
             yield conn
         finally:
-            with self._lock:
-                if len(self._connections) < self.pool_size:
-                    self._connections.append(conn)
-                else:
-                    conn.close()
+            try:
+                self._ro_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    # SecurityMiddleware.validate_query only lets SELECTs through, so
+    # the default checkout is the read-only pool
+    get_connection = get_read_connection
+    
+    @contextmanager
+    def get_write_connection(self):
+        conn = self._rw_pool.get(timeout=CONFIG.DATABASE_TIMEOUT)
+        try:
+            yield conn
+        finally:
+            try:
+                self._rw_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Monitoring uchun snapshot"""
+        return {
+            'pool_size': self._ro_pool.qsize(),
+            'max_pool_size': self.pool_size
+        }
     
     def close_all(self):
-        with self._lock:
-            for conn in self._connections:
+        for pool in (self._ro_pool, self._rw_pool):
+            while True:
+                try:
+                    conn = pool.get_nowait()
+                except queue.Empty:
+                    break
                 conn.close()
-            self._connections.clear()
 
 class QueryCache:    
+    # 16-way striping: unrelated keys almost never share a lock
+    STRIPE_COUNT = 16
+    
     def __init__(self, max_size: int = 1000, ttl: int = 3600):
         self.max_size = max_size
         self.ttl = ttl
-        self._cache: Dict[str, Dict[str, Any]] = {}
-        self._lock = threading.Lock()
+        self._stripe_max = max(1, max_size // self.STRIPE_COUNT)
+        # per stripe: LRU dict, a (timestamp, query) min-heap for TTL
+        # expiry, and the stripe lock
+        self._stripes = [(OrderedDict(), [], threading.Lock())
+                         for _ in range(self.STRIPE_COUNT)]
+    
+    def _stripe(self, query: str):
+        return self._stripes[hash(query) & (self.STRIPE_COUNT - 1)]
     
     def get(self, query: str) -> Optional[Dict[str, Any]]:
-        with self._lock:
-            if query in self._cache:
-                cached_data = self._cache[query]
+        cache, _, lock = self._stripe(query)
+        with lock:
+            if query in cache:
+                cached_data = cache[query]
                 if time.time() - cached_data['timestamp'] < self.ttl:
+                    cache.move_to_end(query)
                     return cached_data['data']
                 else:
-                    del self._cache[query]
+                    del cache[query]
         return None
     
     def set(self, query: str, data: Dict[str, Any]):
-        with self._lock:
-            if len(self._cache) >= self.max_size:
-                oldest_key = min(self._cache.keys(), 
-                               key=lambda k: self._cache[k]['timestamp'])
-                del self._cache[oldest_key]
+        cache, heap, lock = self._stripe(query)
+        with lock:
+            if query not in cache and len(cache) >= self._stripe_max:
+                cache.popitem(last=False)
             
-            self._cache[query] = {
+            timestamp = time.time()
+            cache[query] = {
                 'data': data,
-                'timestamp': time.time()
+                'timestamp': timestamp
             }
+            cache.move_to_end(query)
+            heapq.heappush(heap, (timestamp, query))
     
     def clear(self):
-        with self._lock:
-            self._cache.clear()
+        for cache, heap, lock in self._stripes:
+            with lock:
+                cache.clear()
+                heap.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Monitoring uchun snapshot - har bir stripe o'z locki ostida"""
+        size = 0
+        for cache, _, lock in self._stripes:
+            with lock:
+                size += len(cache)
+        return {'size': size, 'max_size': self.max_size, 'ttl': self.ttl}
     
     def cleanup_expired(self):
-        with self._lock:
-            current_time = time.time()
-            expired_keys = [
-                key for key, value in self._cache.items()
-                if current_time - value['timestamp'] >= self.ttl
-            ]
-            for key in expired_keys:
-                del self._cache[key]
+        # pop expired heap heads instead of scanning every entry; stale
+        # heap records (key re-set or already evicted) are discarded
+        # lazily when their timestamp no longer matches
+        cutoff = time.time() - self.ttl
+        for cache, heap, lock in self._stripes:
+            with lock:
+                while heap and heap[0][0] <= cutoff:
+                    timestamp, query = heapq.heappop(heap)
+                    entry = cache.get(query)
+                    if entry is not None and entry['timestamp'] == timestamp:
+                        del cache[query]
 
 class RateLimiter:    
+    WINDOW_SECONDS = 60.0
+    # same 16-way striping as QueryCache: two clients almost never
+    # share a lock on the per-request hot path
+    STRIPE_COUNT = 16
+    # cap on tracked clients so the map can't grow one entry per unique
+    # IP forever; LRU eviction drops the longest-idle client
+    MAX_CLIENTS = 100_000
+    
     def __init__(self, max_requests_per_minute: int = 60):
         self.max_requests = max_requests_per_minute
-        self._requests = {}
-        self._lock = threading.Lock()
+        self._stripe_max = max(1, self.MAX_CLIENTS // self.STRIPE_COUNT)
+        # client_id -> deque of request timestamps inside the rolling
+        # window; monotonic time so clock jumps can't skew the window
+        # and bucket math stays consistent across stripes
+        self._stripes = [(OrderedDict(), threading.Lock())
+                         for _ in range(self.STRIPE_COUNT)]
+    
+    def _stripe(self, client_id: str):
+        return self._stripes[hash(client_id) & (self.STRIPE_COUNT - 1)]
     
     def is_allowed(self, client_id: str) -> bool:
-        with self._lock:
-            current_time = time.time()
-            current_minute = int(current_time / 60)
-            
-            if client_id not in self._requests:
-                self._requests[client_id] = {}
-            
-            client_requests = self._requests[client_id]
-            
-            for minute in list(client_requests.keys()):
-                if minute < current_minute:
-                    del client_requests[minute]
-            
-            if current_minute in client_requests:
-                if client_requests[current_minute] >= self.max_requests:
-                    return False
-                client_requests[current_minute] += 1
+        now = time.monotonic()
+        cutoff = now - self.WINDOW_SECONDS
+        windows, lock = self._stripe(client_id)
+        with lock:
+            window = windows.get(client_id)
+            if window is None:
+                if len(windows) >= self._stripe_max:
+                    windows.popitem(last=False)
+                window = windows[client_id] = deque()
             else:
-                client_requests[current_minute] = 1
+                windows.move_to_end(client_id)
+            
+            while window and window[0] < cutoff:
+                window.popleft()
             
+            if len(window) >= self.max_requests:
+                return False
+            window.append(now)
             return True
+    
+    def cleanup_idle(self, max_idle: float = 3600.0):
+        """Idle klientlar oynalarini o'chirish"""
+        cutoff = time.monotonic() - max_idle
+        for windows, lock in self._stripes:
+            with lock:
+                idle = [client_id for client_id, window in windows.items()
+                        if not window or window[-1] < cutoff]
+                for client_id in idle:
+                    del windows[client_id]
 
 class ProductionLogger:    
-    @staticmethod
-    def setup_logging():
+    _listener = None
+    
+    @classmethod
+    def setup_logging(cls):
         os.makedirs('logs', exist_ok=True)
         
         logger = logging.getLogger()
-        logger.setLevel(getattr(logging, ProductionConfig.LOG_LEVEL))
+        logger.setLevel(getattr(logging, CONFIG.LOG_LEVEL))
         
         file_handler = RotatingFileHandler(
-            f"logs/{ProductionConfig.LOG_FILE}",
-            maxBytes=ProductionConfig.LOG_MAX_SIZE_MB * 1024 * 1024,
-            backupCount=ProductionConfig.LOG_BACKUP_COUNT
+            f"logs/{CONFIG.LOG_FILE}",
+            maxBytes=CONFIG.LOG_MAX_SIZE_MB * 1024 * 1024,
+            backupCount=CONFIG.LOG_BACKUP_COUNT
         )
         
         console_handler = logging.StreamHandler()
@@ -179,10 +345,30 @@ class ProductionLogger:
         file_handler.setFormatter(formatter)
         console_handler.setFormatter(formatter)
         
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # request threads only enqueue records; disk writes and log
+        # rotation happen on the listener thread, off the hot path
+        log_queue = queue.SimpleQueue()
+        logger.handlers = [QueueHandler(log_queue)]
+        
+        cls._listener = QueueListener(
+            log_queue, file_handler, console_handler,
+            respect_handler_level=True
+        )
+        cls._listener.start()
         
         return logger
+    
+    @classmethod
+    def stop_logging(cls):
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
+_DANGEROUS_RE = re.compile(
+    r'\b(DROP|DELETE|UPDATE|INSERT|ALTER|CREATE|TRUNCATE|EXEC(?:UTE)?)\b',
+    re.IGNORECASE
+)
+_SANITIZE_RE = re.compile(r'[<>:"/\\|?*]')
 
 class SecurityMiddleware:    
     @staticmethod
@@ -190,76 +376,88 @@ class SecurityMiddleware:
         if not query or not query.strip():
             return False, "Bo'sh query"
         
-        if len(query) > ProductionConfig.MAX_QUERY_LENGTH:
+        if len(query) > CONFIG.MAX_QUERY_LENGTH:
             return False, "Query juda uzun"
         
-        dangerous_keywords = [
-            'DROP', 'DELETE', 'UPDATE', 'INSERT', 'ALTER', 
-            'CREATE', 'TRUNCATE', 'EXEC', 'EXECUTE'
-        ]
-        
-        query_upper = query.upper()
-        for keyword in dangerous_keywords:
-            if keyword in query_upper:
-                return False, f"Xavfli SQL keyword: {keyword}"
+        match = _DANGEROUS_RE.search(query)
+        if match:
+            return False, f"Xavfli SQL keyword: {match.group(1).upper()}"
         
         return True, "OK"
     
     @staticmethod
     def sanitize_filename(filename: str) -> str:
-        import re
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+        filename = _SANITIZE_RE.sub('_', filename)
         if len(filename) > 100:
             name, ext = os.path.splitext(filename)
             filename = name[:95] + ext
         return filename
 
 class PerformanceMonitor:    
+    # log-spaced latency histogram covering 1us..60s: recording is one
+    # bucket increment, percentiles cost O(64) regardless of traffic
+    BUCKET_COUNT = 64
+    _LOG_MIN = math.log(1e-6)
+    _LOG_MAX = math.log(60.0)
+    _LOG_SCALE = (BUCKET_COUNT - 1) / (_LOG_MAX - _LOG_MIN)
+    
     def __init__(self):
-        self._metrics = {
-            'query_count': 0,
-            'query_times': [],
-            'error_count': 0,
-            'cache_hits': 0,
-            'cache_misses': 0
-        }
+        self._query_count = 0
+        self._error_count = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._buckets = [0] * self.BUCKET_COUNT
+        self._times_sum = 0.0
         self._lock = threading.Lock()
     
+    def _bucket_index(self, duration: float) -> int:
+        idx = int((math.log(max(duration, 1e-9)) - self._LOG_MIN) * self._LOG_SCALE)
+        return min(self.BUCKET_COUNT - 1, max(0, idx))
+    
+    def _percentile(self, fraction: float) -> float:
+        """Bucket markazidan taxminiy percentile qiymati"""
+        target = self._query_count * fraction
+        cumulative = 0
+        for i, count in enumerate(self._buckets):
+            cumulative += count
+            if cumulative >= target:
+                return math.exp(self._LOG_MIN + (i + 0.5) / self._LOG_SCALE)
+        return 0.0
+    
     def record_query_time(self, duration: float):
         with self._lock:
-            self._metrics['query_count'] += 1
-            self._metrics['query_times'].append(duration)
-            
-            if len(self._metrics['query_times']) > 1000:
-                self._metrics['query_times'] = self._metrics['query_times'][-1000:]
+            self._query_count += 1
+            self._buckets[self._bucket_index(duration)] += 1
+            self._times_sum += duration
     
     def record_error(self):
         with self._lock:
-            self._metrics['error_count'] += 1
+            self._error_count += 1
     
     def record_cache_hit(self):
         with self._lock:
-            self._metrics['cache_hits'] += 1
+            self._cache_hits += 1
     
     def record_cache_miss(self):
         with self._lock:
-            self._metrics['cache_misses'] += 1
+            self._cache_misses += 1
     
     def get_metrics(self) -> Dict[str, Any]:
         with self._lock:
-            avg_time = 0
-            if self._metrics['query_times']:
-                avg_time = sum(self._metrics['query_times']) / len(self._metrics['query_times'])
+            avg_time = self._times_sum / self._query_count if self._query_count else 0
             
-            cache_total = self._metrics['cache_hits'] + self._metrics['cache_misses']
+            cache_total = self._cache_hits + self._cache_misses
             cache_hit_rate = 0
             if cache_total > 0:
-                cache_hit_rate = self._metrics['cache_hits'] / cache_total * 100
+                cache_hit_rate = self._cache_hits / cache_total * 100
             
             return {
-                'query_count': self._metrics['query_count'],
-                'error_count': self._metrics['error_count'],
+                'query_count': self._query_count,
+                'error_count': self._error_count,
                 'average_query_time': round(avg_time, 3),
+                'p50_query_time': round(self._percentile(0.50), 3),
+                'p95_query_time': round(self._percentile(0.95), 3),
+                'p99_query_time': round(self._percentile(0.99), 3),
                 'cache_hit_rate': round(cache_hit_rate, 1),
                 'total_cache_requests': cache_total
             }
@@ -267,30 +465,36 @@ class PerformanceMonitor:
 class FileCleanupService:    
     def __init__(self, reports_dir: str = 'reports'):
         self.reports_dir = reports_dir
-        self.cleanup_interval = ProductionConfig.CLEANUP_INTERVAL_HOURS * 3600
-        self._running = False
+        self.cleanup_interval = CONFIG.CLEANUP_INTERVAL_HOURS * 3600
+        # Event.wait returns the moment stop() sets it, so shutdown is
+        # prompt instead of waiting out a 24h sleep
+        self._stop = threading.Event()
         self._thread = None
     
     def start(self):
-        if not self._running:
-            self._running = True
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
             self._thread = threading.Thread(target=self._cleanup_loop)
             self._thread.daemon = True
             self._thread.start()
     
     def stop(self):
-        self._running = False
+        self._stop.set()
         if self._thread:
-            self._thread.join()
+            self._thread.join(timeout=10)
     
     def _cleanup_loop(self):
-        while self._running:
+        while not self._stop.is_set():
             try:
                 self._cleanup_old_files()
-                time.sleep(self.cleanup_interval)
+                if rate_limiter is not None:
+                    rate_limiter.cleanup_idle()
+                if query_cache is not None:
+                    query_cache.cleanup_expired()
+                self._stop.wait(self.cleanup_interval)
             except Exception as e:
                 logging.error(f"Cleanup service xatosi: {e}")
-                time.sleep(300) 
+                self._stop.wait(300)
     
     def _cleanup_old_files(self):
         if not os.path.exists(self.reports_dir):
@@ -299,16 +503,19 @@ class FileCleanupService:
         current_time = time.time()
         max_age = 7 * 24 * 3600  
         
-        for filename in os.listdir(self.reports_dir):
-            filepath = os.path.join(self.reports_dir, filename)
-            if os.path.isfile(filepath):
-                file_age = current_time - os.path.getmtime(filepath)
+        # DirEntry caches stat data from the directory read - one
+        # syscall per file instead of join/isfile/getmtime
+        with os.scandir(self.reports_dir) as entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                file_age = current_time - entry.stat().st_mtime
                 if file_age > max_age:
                     try:
-                        os.remove(filepath)
-                        logging.info(f"Eski fayl o'chirildi: {filename}")
+                        os.remove(entry.path)
+                        logging.info(f"Eski fayl o'chirildi: {entry.name}")
                     except Exception as e:
-                        logging.error(f"Fayl o'chirishda xato {filename}: {e}")
+                        logging.error(f"Fayl o'chirishda xato {entry.name}: {e}")
 
 db_pool = None
 query_cache = None
@@ -324,20 +531,20 @@ def initialize_production_services():
     logger.info("Production services ishga tushirilmoqda...")
     
     db_pool = DatabasePool(
-        ProductionConfig.DATABASE_PATH,
-        ProductionConfig.DATABASE_POOL_SIZE
+        CONFIG.DATABASE_PATH,
+        CONFIG.DATABASE_POOL_SIZE
     )
     
     query_cache = QueryCache(
-        ProductionConfig.CACHE_MAX_SIZE,
-        ProductionConfig.CACHE_TTL
+        CONFIG.CACHE_MAX_SIZE,
+        CONFIG.CACHE_TTL
     )
     
-    rate_limiter = RateLimiter(ProductionConfig.RATE_LIMIT_PER_MINUTE)
+    rate_limiter = RateLimiter(CONFIG.RATE_LIMIT_PER_MINUTE)
     
     performance_monitor = PerformanceMonitor()
     
-    cleanup_service = FileCleanupService(ProductionConfig.REPORTS_DIR)
+    cleanup_service = FileCleanupService(CONFIG.REPORTS_DIR)
     cleanup_service.start()
     
     logger.info("Production services muvaffaqiyatli ishga tushdi")
@@ -358,13 +565,14 @@ def shutdown_production_services():
         query_cache.clear()
     
     logger.info("Production services to'xtatildi")
+    ProductionLogger.stop_logging()
 
 class ProductionFlaskConfig:    
-    SECRET_KEY = ProductionConfig.SECRET_KEY
+    SECRET_KEY = CONFIG.SECRET_KEY
     DEBUG = False
     TESTING = False
     
-    SQLALCHEMY_DATABASE_URI = f'sqlite:///{ProductionConfig.DATABASE_PATH}'
+    SQLALCHEMY_DATABASE_URI = f'sqlite:///{CONFIG.DATABASE_PATH}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
     SECURITY_HEADERS = {
@@ -375,7 +583,7 @@ class ProductionFlaskConfig:
         'Content-Security-Policy': "default-src 'self'; script-src 'self' 'unsafe-inline'; style-src 'self' 'unsafe-inline';"
     }
     
-    MAX_CONTENT_LENGTH = ProductionConfig.MAX_REPORT_SIZE_MB * 1024 * 1024
+    MAX_CONTENT_LENGTH = CONFIG.MAX_REPORT_SIZE_MB * 1024 * 1024
     
     SESSION_COOKIE_SECURE = True
     SESSION_COOKIE_HTTPONLY = True
@@ -410,27 +618,21 @@ class ProductionMonitoring:
     def metrics():
         return {
             'performance': performance_monitor.get_metrics(),
-            'cache': {
-                'size': len(query_cache._cache),
-                'max_size': query_cache.max_size,
-                'ttl': query_cache.ttl
-            },
-            'database': {
-                'pool_size': len(db_pool._connections),
-                'max_pool_size': db_pool.pool_size
-            }
+            'cache': query_cache.stats(),
+            'database': db_pool.stats()
         }
 
 GUNICORN_CONFIG = '''
 # gunicorn.conf.py
-bind = "0.0.0.0:5000"
+# faqat nginx'dan keladigan trafik uchun - tashqariga ochilmaydi
+bind = "127.0.0.1:5000"
 workers = 4
 worker_class = "sync"
-worker_connections = 1000
+worker_connections = 2000
 max_requests = 1000
 max_requests_jitter = 100
 timeout = 60
-keepalive = 5
+keepalive = 30
 preload_app = True
 user = "bankapp"
 group = "bankapp"
@@ -440,6 +642,13 @@ accesslog = "/var/log/gunicorn/access.log"
 errorlog = "/var/log/gunicorn/error.log"
 loglevel = "info"
 access_log_format = '%%(h)s %%(l)s %%(u)s %%(t)s "%%(r)s" %%(s)s %%(b)s "%%(f)s" "%%(a)s" %%(D)s'
+
+# SQLite connections are not fork-safe: with preload_app the master must
+# not open the pool, or workers inherit shared descriptors and locks.
+# Open all production services per worker, after the fork.
+def post_fork(server, worker):
+    from production_config import initialize_production_services
+    initialize_production_services()
 '''
 
 NGINX_CONFIG = '''
@@ -464,9 +673,32 @@ server {
     ssl_ciphers HIGH:!aNULL:!MD5;
 
     client_max_body_size 100M;
+
+    # statik fayllar kernel sendfile orqali - Python worker uyg'onmaydi
+    sendfile on;
+    tcp_nopush on;
+
+    # JSON javoblarni proxy qatlamida siqish - Python workerlar band emas
+    gzip on;
+    gzip_types application/json;
+    gzip_min_length 1024;
+    gzip_comp_level 5;
+    gzip_proxied any;
+
+    location = / {
+        root /app;
+        try_files /index.html =404;
+    }
+
+    location /download/ {
+        alias /app/reports/;
+        add_header Content-Disposition "attachment";
+    }
     
     location / {
         proxy_pass http://bank_analyst;
+        proxy_http_version 1.1;
+        proxy_set_header Connection "";
         proxy_set_header Host $host;
         proxy_set_header X-Real-IP $remote_addr;
         proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
@@ -607,6 +839,7 @@ def load_environment_config(env: str = 'production'):
     if env in ENVIRONMENTS:
         for key, value in ENVIRONMENTS[env].items():
             os.environ[key] = str(value)
+        CONFIG.reload()
     else:
         raise ValueError(f"Noma'lum environment: {env}")
 
@@ -1,19 +1,95 @@
-from flask import Flask, jsonify, request, send_file, send_from_directory
+from flask import Flask, Response, jsonify, request, send_file, send_from_directory
 from flask_cors import CORS
+from werkzeug.exceptions import NotFound
 import os
+import json
+import time
 import sqlite3
+import threading
 import logging
-from datetime import datetime
 from bank_analyst import BankAnalystAssistant
 
+# orjson ixtiyoriy - bo'lsa JSON encode/decode sezilarli tezlashadi
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__, static_folder='.')
-CORS(app)
+# JSON API: slash-redirect va jsonify'dagi ortiqcha ishlov kerak emas
+app.url_map.strict_slashes = False
+app.json.sort_keys = False
+app.json.compact = True
+
+if orjson is not None:
+    from flask.json.provider import JSONProvider
+
+    class _OrjsonProvider(JSONProvider):
+        """jsonify va request.get_json uchun orjson"""
+
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(obj, default=str).decode()
+
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+
+    app.json = _OrjsonProvider(app)
+# CORS faqat API yo'llariga; max_age bilan preflight 24 soat keshlanadi
+CORS(app, resources={r"/api/*": {
+    "origins": os.getenv('CORS_ORIGINS', '*').split(','),
+    "max_age": 86400
+}})
 
 DB_PATH = "bank_data.db"
 
+# /api/stats full-scan natijalarini qisqa muddat keshlab turamiz
+STATS_TTL = 30  # seconds
+_stats_cache = {'t': 0.0, 'v': None}
+
+def invalidate_stats():
+    """Yozuvdan keyin stats keshini bekor qilish"""
+    _stats_cache['v'] = None
+
+# bitta so'rov - to'rtta alohida execute/fetch o'rniga; modul darajada
+# turgani uchun SQLite'ning prepared-statement keshi doim uradi
+_STATS_SQL = '''
+SELECT (SELECT COUNT(*) FROM clients),
+       (SELECT COUNT(*) FROM accounts),
+       (SELECT COUNT(*) FROM transactions),
+       (SELECT COALESCE(SUM(balance), 0) FROM accounts)
+'''
+
+sqlite3.enable_callback_tracebacks(False)
+
+# har bir worker thread uchun bitta doimiy connection - har so'rovda
+# connect/schema-parse qilmaslik va sahifa keshini issiq saqlash uchun
+_db_local = threading.local()
+
+def _json_response(payload, status=200):
+    """Issiq endpointlar uchun ixcham JSON - jsonify'siz"""
+    if orjson is not None:
+        body = orjson.dumps(payload, default=str)
+    else:
+        body = json.dumps(payload, ensure_ascii=False,
+                          separators=(',', ':'), default=str)
+    return Response(body, mimetype='application/json', status=status)
+
+def _get_db():
+    conn = getattr(_db_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False,
+                               cached_statements=256)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA cache_size=-65536')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=268435456')
+        _db_local.conn = conn
+    return conn
+
 assistant = None
 
 def init_assistant():
@@ -30,42 +106,36 @@ def init_assistant():
 def index():
     return send_file('index.html')
 
-@app.route('/api/stats')
+@app.route('/api/stats', provide_automatic_options=False)
 def get_database_stats():
     try:
-        conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT COUNT(*) FROM clients")
-        clients_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM accounts")
-        accounts_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COUNT(*) FROM transactions")
-        transactions_count = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT COALESCE(SUM(balance), 0) FROM accounts")
-        total_balance = cursor.fetchone()[0]
+        if _stats_cache['v'] is not None and time.monotonic() - _stats_cache['t'] < STATS_TTL:
+            return _json_response(_stats_cache['v'])
         
-        conn.close()
+        cursor = _get_db().cursor()
+        cursor.execute(_STATS_SQL)
+        clients_count, accounts_count, transactions_count, total_balance = cursor.fetchone()
         
-        return jsonify({
+        payload = {
             'clients': clients_count,
             'accounts': accounts_count,
             'transactions': transactions_count,
             'total_balance': round(float(total_balance), 2)
-        })
+        }
+        _stats_cache['v'] = payload
+        _stats_cache['t'] = time.monotonic()
+        
+        return _json_response(payload)
     
     except Exception as e:
         logger.error(f"Stats error: {e}")
-        return jsonify({
+        return _json_response({
             'clients': 0,
             'accounts': 0,
             'transactions': 0,
             'total_balance': 0,
             'error': str(e)
-        }), 500
+        }, status=500)
 
 @app.route('/api/query', methods=['POST'])
 def process_query():
@@ -81,22 +151,36 @@ def process_query():
                 'error': 'Query kiritilmagan'
             }), 400
         
-        result = assistant.process_query(query)
+        if assistant is None:
+            return _json_response({
+                'success': False,
+                'error': 'Assistant ishga tushmagan'
+            }, status=503)
         
+        # LIMIT bazaga suriladi: 100 tadan ortiq qator o'qilmaydi ham
+        result = assistant.process_query(query, limit=100)
+
         if result['success']:
-            return jsonify({
+            # yozuv so'rovi o'tgan bo'lsa stats keshi eskirdi
+            if not result['sql_query'].lstrip().upper().startswith('SELECT'):
+                invalidate_stats()
+            # ustun nomlari bir marta yuboriladi - har qator uchun
+            # kalitlarni takrorlash payloadni ikki baravargacha shishiradi
+            df = result['data']
+            return _json_response({
                 'success': True,
                 'sql_query': result['sql_query'],
-                'data': result['data'][:100], 
+                'columns': list(df.columns),
+                'rows': df.values.tolist(),
                 'row_count': result['row_count'],
-                'total_rows': len(result['data'])
+                'total_rows': result['row_count']
             })
         else:
-            return jsonify({
+            return _json_response({
                 'success': False,
                 'error': result['error'],
                 'sql_query': result.get('sql_query', '')
-            }), 400
+            }, status=400)
     
     except Exception as e:
         logger.error(f"Query error: {e}")
@@ -118,11 +202,19 @@ def generate_report():
                 'error': 'Query kiritilmagan'
             }), 400
         
+        if assistant is None:
+            return _json_response({
+                'success': False,
+                'error': 'Assistant ishga tushmagan'
+            }, status=503)
+        
         filepath = assistant.generate_report(query, chart_type)
         
-        if filepath and os.path.exists(filepath):
+        # assistant fayl yo'lini o'zi yaratdi - qo'shimcha stat() shart emas;
+        # yuklab olishda send_from_directory baribir 404 qaytaradi
+        if filepath:
             filename = os.path.basename(filepath)
-            return jsonify({
+            return _json_response({
                 'success': True,
                 'filename': filename,
                 'filepath': filepath,
@@ -144,53 +236,64 @@ def generate_report():
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
-        filepath = os.path.join('reports', filename)
-        if os.path.exists(filepath):
-            return send_file(filepath, as_attachment=True)
-        else:
-            return jsonify({'error': 'Fayl topilmadi'}), 404
+        # send_from_directory yo'lni xavfsiz hal qiladi (path traversal
+        # yo'q) va conditional=True bilan 304/Range javoblarni beradi
+        return send_from_directory(os.path.abspath('reports'), filename,
+                                   as_attachment=True, conditional=True)
+    except NotFound:
+        return jsonify({'error': 'Fayl topilmadi'}), 404
     except Exception as e:
         logger.error(f"Download error: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/examples')
+# ro'yxat statik - JSON bir marta import paytida tayyorlanadi
+_EXAMPLES_JSON = json.dumps({'examples': [
+    {
+        'title': 'Viloyatlar bo\'yicha',
+        'query': 'Har bir viloyatdagi mijozlar sonini ko\'rsat',
+        'chart': 'pie'
+    },
+    {
+        'title': 'Eng katta balanslar',
+        'query': 'Eng ko\'p balansga ega 10 ta hisobni ko\'rsat',
+        'chart': 'bar'
+    },
+    {
+        'title': 'Toshkent mijozlari',
+        'query': 'Toshkent viloyatidagi mijozlar sonini ko\'rsat',
+        'chart': 'bar'
+    },
+    {
+        'title': 'Hisob turlari',
+        'query': 'Har bir hisob turida qancha hisob borligini ko\'rsat',
+        'chart': 'pie'
+    },
+    {
+        'title': 'Tranzaksiyalar',
+        'query': '2024 yildagi jami tranzaksiyalar sonini ko\'rsat',
+        'chart': 'bar'
+    }
+]}, ensure_ascii=False)
+
+@app.route('/api/examples', provide_automatic_options=False)
 def get_examples():
-    examples = [
-        {
-            'title': 'Viloyatlar bo\'yicha',
-            'query': 'Har bir viloyatdagi mijozlar sonini ko\'rsat',
-            'chart': 'pie'
-        },
-        {
-            'title': 'Eng katta balanslar',
-            'query': 'Eng ko\'p balansga ega 10 ta hisobni ko\'rsat',
-            'chart': 'bar'
-        },
-        {
-            'title': 'Toshkent mijozlari',
-            'query': 'Toshkent viloyatidagi mijozlar sonini ko\'rsat',
-            'chart': 'bar'
-        },
-        {
-            'title': 'Hisob turlari',
-            'query': 'Har bir hisob turida qancha hisob borligini ko\'rsat',
-            'chart': 'pie'
-        },
-        {
-            'title': 'Tranzaksiyalar',
-            'query': '2024 yildagi jami tranzaksiyalar sonini ko\'rsat',
-            'chart': 'bar'
-        }
-    ]
-    
-    return jsonify({'examples': examples})
+    return Response(_EXAMPLES_JSON, mimetype='application/json',
+                    headers={'Cache-Control': 'public, max-age=3600'})
+
+# load-balancer har sekundda uradi - stat() natijasini 5s ushlab turamiz
+_HEALTH_TTL = 5  # seconds
+_health_cache = {'t': 0.0, 'db': False}
 
-@app.route('/health')
+@app.route('/health', provide_automatic_options=False)
 def health():
-    return jsonify({
+    now = time.monotonic()
+    if now - _health_cache['t'] >= _HEALTH_TTL:
+        _health_cache['db'] = os.path.exists(DB_PATH)
+        _health_cache['t'] = now
+    return _json_response({
         'status': 'ok',
-        'database': os.path.exists(DB_PATH),
-        'timestamp': datetime.now().isoformat()
+        'database': _health_cache['db'],
+        'timestamp': time.time()
     })
 
 if __name__ == '__main__':
@@ -216,6 +319,7 @@ if __name__ == '__main__':
     print("📍 API: http://localhost:5000/api/stats")
     print("📍 Health: http://localhost:5000/health")
     print("\n⚠️  Development server - production uchun emas!")
+    print("⚠️  Production: gunicorn -c gunicorn.conf.py web_app:app")
     print("=" * 50)
     
-    app.run(host='0.0.0.0', port=5000, debug=False)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=5000, debug=False, threaded=True)
\ No newline at end of file